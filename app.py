@@ -1,156 +1,332 @@
 import streamlit as st
 import asyncio
 import os
-import subprocess
 import sys
 from dotenv import load_dotenv
-from gemini_live_cam import AudioLoop, client
+from gemini_live_cam import AudioLoop
 import threading
 import queue
 import cv2
 import numpy as np
-from PIL import Image
-import io
-import signal
+import time
+import atexit
+
+# Rate at which camera frames are decoded and pushed to the UI
+DISPLAY_FPS = 10
+# Width frames are scaled down to before display; the widget never renders wider
+DISPLAY_WIDTH = 640
+# JPEG settings for frames sent to the browser
+JPEG_PARAMS = (int(cv2.IMWRITE_JPEG_QUALITY), 70)
+
+class LatestFrame:
+    """Single-slot holder for the newest camera frame.
+
+    The capture thread overwrites the slot and the render loop reads it, so
+    the UI always shows the freshest frame and never waits on the camera.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frame = None
+
+    def put(self, frame):
+        with self.lock:
+            self.frame = frame
+
+    def get(self):
+        # retrieve() hands back a new array for every frame, so the reference
+        # can be shared without copying
+        with self.lock:
+            return self.frame
+
+# Session state keys and factories for their initial values. Factories rather
+# than values, so every browser session gets its own queue and history.
+_SESSION_DEFAULTS = (
+    ('session_started', bool),
+    ('loop', lambda: None),
+    ('audio', lambda: None),
+    ('audio_task', lambda: None),
+    ('response_queue', queue.Queue),
+    ('responses', list),
+    ('api_key_status', bool),
+    ('camera', lambda: None),
+)
 
 # Initialize all session state variables at the start
 def init_session_state():
-    if 'session_started' not in st.session_state:
-        st.session_state.session_started = False
-    if 'process' not in st.session_state:
-        st.session_state.process = None
-    if 'text_input' not in st.session_state:
-        st.session_state.text_input = ""
-    if 'api_key_status' not in st.session_state:
-        st.session_state.api_key_status = False
-    if 'camera_placeholder' not in st.session_state:
-        st.session_state.camera_placeholder = None
-    if 'camera_thread' not in st.session_state:
-        st.session_state.camera_thread = None
-    if 'cap' not in st.session_state:
-        st.session_state.cap = None
+    state = st.session_state
+    for key, factory in _SESSION_DEFAULTS:
+        if key not in state:
+            state[key] = factory()
 
 # Call initialization
 init_session_state()
 
+@st.cache_resource
+def get_client():
+    """Gemini client shared by every session and rerun"""
+    from gemini_live_cam import client
+    return client
+
 # Check API key status
-def check_api_key():
+@st.cache_resource
+def _api_key_ok(key):
+    """Validate the API key once per key value instead of on every rerun"""
     try:
         # Try to access the client to verify API key
-        if client:
-            st.session_state.api_key_status = True
-            return True
+        return bool(key) and get_client() is not None
     except Exception as e:
-        st.session_state.api_key_status = False
         return False
 
+def check_api_key():
+    st.session_state.api_key_status = _api_key_ok(os.getenv("GEMINI_API_KEY", ""))
+    return st.session_state.api_key_status
+
+def _run_event_loop(loop):
+    """Run the session's event loop until it is stopped, then close it"""
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+
+async def _run_session(audio):
+    """Run the AudioLoop, stopping the event loop once it finishes for any reason"""
+    try:
+        await audio.run()
+    finally:
+        asyncio.get_running_loop().stop()
+
+def _reap(audio, audio_task, loop):
+    """Stop the AudioLoop and its event loop without holding up the UI"""
+    try:
+        asyncio.run_coroutine_threadsafe(audio.stop(), loop).result(timeout=10)
+    except Exception as e:
+        print(f"Error stopping session: {str(e)}")
+    # Cancelling run() unwinds its task group, after which _run_session stops the loop
+    audio_task.cancel()
+
 def start_session():
-    """Start the backend file as a subprocess"""
-    if not check_api_key():
+    """Start the Gemini Live session on a background event loop"""
+    if not st.session_state.api_key_status:
         st.error("API key not found or invalid. Please check your .env file.")
         return
         
     try:
-        # Start the backend file as a subprocess with stdin/stdout pipes
-        st.session_state.process = subprocess.Popen(
-            [sys.executable, 'gemini_live_cam.py'],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+        # Join the shared camera; update_camera_feed renders what it captures
+        st.session_state.camera = get_camera()
+        st.session_state.camera.acquire()
+
+        # Run AudioLoop in-process on its own event loop thread
+        st.session_state.loop = asyncio.new_event_loop()
+        threading.Thread(target=_run_event_loop, args=(st.session_state.loop,), daemon=True).start()
+        # Model text arrives on the event loop thread and is queued for the UI.
+        # Frames come from the shared camera, and there is no OpenCV window:
+        # HighGUI cannot run inside the server.
+        st.session_state.audio = AudioLoop(
+            video_mode="camera",
+            read_stdin=False,
+            on_text=st.session_state.response_queue.put_nowait,
+            show_preview=False,
+            frame_source=st.session_state.camera.latest.get
+        )
+        st.session_state.audio_task = asyncio.run_coroutine_threadsafe(
+            _run_session(st.session_state.audio), st.session_state.loop
         )
         st.session_state.session_started = True
         st.success("Session started successfully!")
-        
-        # Create camera placeholder
-        st.session_state.camera_placeholder = st.empty()
-        
-        # Start camera feed update in a separate thread
-        st.session_state.camera_thread = threading.Thread(target=update_camera_feed, daemon=True)
-        st.session_state.camera_thread.start()
     except Exception as e:
         st.error(f"Error starting session: {str(e)}")
         st.session_state.session_started = False
-        st.session_state.process = None
+        if st.session_state.loop is not None:
+            st.session_state.loop.call_soon_threadsafe(st.session_state.loop.stop)
+        st.session_state.loop = None
+        st.session_state.audio = None
+        st.session_state.audio_task = None
+        if st.session_state.camera is not None:
+            st.session_state.camera.release()
+            st.session_state.camera = None
 
 def stop_session():
     """Stop the session and clean up resources"""
     try:
-        if st.session_state.process:
-            # Send SIGTERM to the process
-            st.session_state.process.send_signal(signal.SIGTERM)
-            # Wait for the process to terminate
-            st.session_state.process.wait(timeout=5)
-            st.session_state.process = None
+        if st.session_state.audio is not None:
+            # Tear the session down in the background so the UI stays responsive
+            threading.Thread(
+                target=_reap,
+                args=(st.session_state.audio, st.session_state.audio_task, st.session_state.loop),
+                daemon=True
+            ).start()
+            st.session_state.audio = None
+            st.session_state.audio_task = None
+            st.session_state.loop = None
 
         # Stop the camera feed
         st.session_state.session_started = False
-        
-        # Release camera
-        if st.session_state.cap is not None:
-            st.session_state.cap.release()
-            st.session_state.cap = None
-
-        if st.session_state.camera_placeholder:
-            st.session_state.camera_placeholder.empty()
-            
-        # Wait for camera thread to finish
-        if st.session_state.camera_thread and st.session_state.camera_thread.is_alive():
-            st.session_state.camera_thread.join(timeout=1)
+
+        # Leave the shared camera; it stops capturing once no session is using it
+        if st.session_state.camera is not None:
+            st.session_state.camera.release()
+            st.session_state.camera = None
 
         st.success("Session stopped successfully!")
     except Exception as e:
         st.error(f"Error stopping session: {str(e)}")
-        # Force kill if normal termination fails
-        if st.session_state.process:
-            st.session_state.process.kill()
-            st.session_state.process = None
 
+def _open_capture():
+    """Open and configure the camera"""
+    if sys.platform.startswith("linux"):
+        # Go straight to V4L2 rather than letting OpenCV fall back to GStreamer
+        cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
+    else:
+        cap = cv2.VideoCapture(0)
+    # Keep the driver queue short and ask for MJPG so grab() stays cheap and
+    # the frames we read are never several buffers old
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FPS, 15)
+    # Have the driver deliver small frames to begin with
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    return cap
+
+def capture_frames(cap, latest, running):
+    """Read the camera into `latest` until `running` is cleared"""
+    try:
+        last = 0.0
+        while running.is_set():
+            # Advance the stream on every frame but only decode the ones we display
+            if not cap.grab():
+                break
+            now = time.monotonic()
+            if now - last < 1.0 / DISPLAY_FPS:
+                continue
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            last = now
+            latest.put(frame)
+    except Exception as e:
+        print(f"Error capturing camera frames: {str(e)}")
+
+class SharedCamera:
+    """The camera, its capture thread and the latest frame, shared by all sessions.
+
+    OpenCV captures must only be read from one thread, so a single capture
+    thread feeds one LatestFrame that every session renders from. Sessions
+    call acquire() on Start and release() on Stop; the thread runs while at
+    least one session holds the camera, and the device itself stays open
+    between sessions.
+    """
+
+    def __init__(self):
+        self.latest = LatestFrame()
+        self._lock = threading.Lock()
+        self._users = 0
+        self._cap = None
+        self._running = None
+        self._thread = None
+        atexit.register(self.close)
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._cap is None or not self._cap.isOpened():
+                # Not opened yet, or the device went away; open it again
+                if self._cap is not None:
+                    self._cap.release()
+                self._cap = _open_capture()
+            # Each thread gets its own stop flag, so one that is still winding
+            # down can never be revived by a later acquire()
+            self._running = threading.Event()
+            self._running.set()
+            self._thread = threading.Thread(
+                target=capture_frames,
+                args=(self._cap, self.latest, self._running),
+                daemon=True
+            )
+            self._thread.start()
+
+    def release(self):
+        with self._lock:
+            if self._users == 0:
+                return
+            self._users -= 1
+            if self._users == 0:
+                self._stop_thread()
+
+    def close(self):
+        """Stop capturing and release the device"""
+        with self._lock:
+            self._users = 0
+            self._stop_thread()
+            if self._cap is not None:
+                self._cap.release()
+                self._cap = None
+
+    def _stop_thread(self):
+        # Called with the lock held; the join is short since grab() returns per frame
+        if self._thread is not None:
+            self._running.clear()
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.latest.put(None)
+
+@st.cache_resource
+def get_camera():
+    """Camera shared by every browser session for the life of the server"""
+    return SharedCamera()
+
+@st.fragment(run_every=1.0 / DISPLAY_FPS)
 def update_camera_feed():
-    if st.session_state.session_started:
-        try:
-            # Initialize camera
-            st.session_state.cap = cv2.VideoCapture(0)
-
-            while st.session_state.session_started:
-                ret, frame = st.session_state.cap.read()
-                if ret:
-                    # Convert frame to RGB
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    # Convert to PIL Image
-                    image = Image.fromarray(frame_rgb)
-                    # Display in Streamlit
-                    st.session_state.camera_placeholder.image(image, channels="RGB", use_column_width=True)
-                else:
-                    break
+    """Render the latest captured frame; reruns on its own without a full script rerun"""
+    try:
+        if st.session_state.camera is None:
+            return
+        frame = st.session_state.camera.latest.get()
+        if frame is None:
+            return
+        # Downscale before the per-pixel work of encoding
+        height, width = frame.shape[:2]
+        if width > DISPLAY_WIDTH:
+            size = (DISPLAY_WIDTH, height * DISPLAY_WIDTH // width)
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        # Encode to JPEG ourselves; OpenCV encodes straight from BGR and
+        # st.image would otherwise encode the array as PNG
+        ok, buf = cv2.imencode('.jpg', frame, JPEG_PARAMS)
+        if ok:
+            # Display in Streamlit
+            st.image(buf.tobytes(), use_column_width=True)
 
-        except Exception as e:
-            st.error(f"Error updating camera feed: {str(e)}")
-        finally:
-            # Release camera when done
-            if st.session_state.cap is not None:
-                st.session_state.cap.release()
-                st.session_state.cap = None
-
-def send_text():
+    except Exception as e:
+        st.error(f"Error updating camera feed: {str(e)}")
+
+def drain_responses(timeout=None):
+    """Move queued model text into the response history without blocking the UI"""
+    try:
+        if timeout is not None:
+            st.session_state.responses.append(st.session_state.response_queue.get(timeout=timeout))
+        while True:
+            st.session_state.responses.append(st.session_state.response_queue.get_nowait())
+    except queue.Empty:
+        pass
+
+def send_text(text):
     if not st.session_state.session_started:
         st.error("Please start the session first!")
         return
 
-    if st.session_state.text_input and st.session_state.process:
+    if text and st.session_state.audio:
         try:
-            # Send text to the running process
-            st.session_state.process.stdin.write(f"{st.session_state.text_input}\n")
-            st.session_state.process.stdin.flush()
-
-            # Read any response
-            response = st.session_state.process.stdout.readline()
-            if response:
-                st.write(f"Response: {response}")
-                
-            st.session_state.text_input = ""  # Clear the input
+            # Hand the text to the session's event loop
+            asyncio.run_coroutine_threadsafe(
+                st.session_state.audio.send_text_value(text),
+                st.session_state.loop
+            )
+            # Give a quick reply a brief chance to show up in this run
+            drain_responses(timeout=0.1)
         except Exception as e:
             st.error(f"Error sending text: {str(e)}")
 
@@ -177,16 +353,21 @@ with col2:
 # Camera Feed Section
 st.header("Camera Feed")
 if st.session_state.session_started:
-    if st.session_state.camera_placeholder is None:
-        st.session_state.camera_placeholder = st.empty()
+    update_camera_feed()
 else:
     st.info("Camera feed will appear here when session starts")
 
 # Text Interaction Section
 st.header("Text Interaction")
-st.text_input("Enter your message", key="text_input", disabled=not st.session_state.session_started)
-if st.button("Send Text", disabled=not st.session_state.session_started):
-    send_text()
+# The form clears its own input on submit, in the same rerun as the send
+with st.form("text_form", clear_on_submit=True):
+    message = st.text_input("Enter your message", disabled=not st.session_state.session_started)
+    sent = st.form_submit_button("Send Text", disabled=not st.session_state.session_started)
+if sent:
+    send_text(message)
+drain_responses()
+if st.session_state.responses:
+    st.write(f"Response: {''.join(st.session_state.responses)}")
 
 # Status Section
 st.header("Session Status")
@@ -199,7 +380,7 @@ else:
 st.header("Instructions")
 st.markdown("""
 1. Make sure your API key is properly set in the .env file
-2. Click 'Start Session' to begin (this will start the backend and camera feed)
+2. Click 'Start Session' to begin (this will start the Gemini session and camera feed)
 3. Use the text input to send messages to Gemini
 4. Click 'Stop Session' when done
 """) 
\ No newline at end of file
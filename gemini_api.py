@@ -1,9 +1,15 @@
-from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional, Literal, Dict, Any
 import asyncio
+import atexit
+import functools
+import itertools
 import logging
+import logging.handlers
 import json
+import queue
 from datetime import datetime
 from dotenv import load_dotenv
 import os
@@ -22,17 +28,29 @@ from gemini_key import (
 # Load environment variables
 load_dotenv()
 
-# Set up logging with file handler
+# Set up logging with file handler. Records are handed to a background
+# listener thread so file and console writes never block the event loop.
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.FileHandler('gemini_api.log'),
+    logging.StreamHandler()
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('gemini_api.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# Max number of request body bytes written to the debug log
+LOG_BODY_BYTES = 256
+
+# Source of per-request ids for log correlation; log lines already carry a timestamp
+_request_counter = itertools.count()
+
 # Validate API key on startup
 if not os.getenv("GEMINI_API_KEY"):
     logger.error("GEMINI_API_KEY not found in environment variables")
@@ -41,7 +59,8 @@ if not os.getenv("GEMINI_API_KEY"):
 app = FastAPI(
     title="Gemini Live API",
     description="API interface for Gemini Live functionality",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 class ModeRequest(BaseModel):
@@ -62,6 +81,17 @@ class ResponseModel(BaseModel):
     message: Optional[str] = None
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
 
+def gemini_endpoint(handler):
+    """Log failures from a Gemini endpoint and report them as HTTP 500"""
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await handler(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Error in {handler.__name__}: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+    return wrapper
+
 @app.get("/")
 async def root():
     """Root endpoint that provides API information"""
@@ -116,21 +146,20 @@ async def root():
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all requests and responses for debugging"""
-    request_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    """Log all requests and responses; headers and a bounded body slice at DEBUG"""
+    request_id = f"{next(_request_counter):08x}"
     logger.info(f"[{request_id}] Request started: {request.method} {request.url}")
 
-    # Log request headers
-    headers = dict(request.headers)
-    logger.info(f"[{request_id}] Request headers: {json.dumps(headers, indent=2)}")
-
-    # Log request body if present
-    try:
-        body = await request.body()
-        if body:
-            logger.info(f"[{request_id}] Request body: {body.decode()}")
-    except Exception as e:
-        logger.error(f"[{request_id}] Error reading request body: {str(e)}")
+    # Headers and body are only logged at DEBUG; reading the body buffers the
+    # whole request before the handler runs
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"[{request_id}] Request headers: {json.dumps(dict(request.headers))}")
+        try:
+            body = await request.body()
+            if body:
+                logger.debug(f"[{request_id}] Request body: {body[:LOG_BODY_BYTES]!r}")
+        except Exception as e:
+            logger.error(f"[{request_id}] Error reading request body: {str(e)}")
 
     # Process the request
     try:
@@ -145,140 +174,107 @@ async def log_requests(request: Request, call_next):
 async def validation_exception_handler(request: Request, exc):
     """Handle validation errors"""
     logger.error(f"Validation error: {exc.errors()}")
-    return Response(
-        content=json.dumps({
+    return ORJSONResponse(
+        content={
             "status": "error",
             "message": "Validation error",
             "details": exc.errors(),
             "timestamp": datetime.now().isoformat()
-        }),
-        status_code=422,
-        media_type="application/json"
+        },
+        status_code=422
     )
 
 @app.post("/run", response_model=ResponseModel)
+@gemini_endpoint
 async def run_gemini(req: ModeRequest):
     """
     Start the Gemini Live session with specified mode.
 
     - **mode**: Can be either "camera" or "screen"
     """
-    try:
-        logger.info(f"Starting Gemini Live with mode: {req.mode}")
-        await GEMINI_RUN(mode=req.mode)
-        return {
-            "status": "success",
-            "message": f"Started Gemini Live in {req.mode} mode",
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error in run_gemini: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"Starting Gemini Live with mode: {req.mode}")
+    await GEMINI_RUN(mode=req.mode)
+    return {
+        "status": "success",
+        "message": f"Started Gemini Live in {req.mode} mode"
+    }
 
 @app.post("/send-text", response_model=ResponseModel)
+@gemini_endpoint
 async def send_text():
     """Send text input to the Gemini Live session."""
-    try:
-        logger.info("Sending text input")
-        await GEMINI_SEND_TEXT()
-        return {
-            "status": "success",
-            "message": "Text input sent",
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error in send_text: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Sending text input")
+    await GEMINI_SEND_TEXT()
+    return {
+        "status": "success",
+        "message": "Text input sent"
+    }
 
 @app.post("/get-frames", response_model=ResponseModel)
+@gemini_endpoint
 async def get_frames():
     """Get frames from the camera."""
-    try:
-        logger.info("Getting frames from camera")
-        await GEMINI_GET_FRAMES()
-        return {
-            "status": "success",
-            "message": "Frames captured",
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error in get_frames: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Getting frames from camera")
+    await GEMINI_GET_FRAMES()
+    return {
+        "status": "success",
+        "message": "Frames captured"
+    }
 
 @app.post("/get-screen", response_model=ResponseModel)
+@gemini_endpoint
 async def get_screen():
     """Get screen capture frames."""
-    try:
-        logger.info("Getting screen capture")
-        await GEMINI_GET_SCREEN()
-        return {
-            "status": "success",
-            "message": "Screen captured",
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error in get_screen: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Getting screen capture")
+    await GEMINI_GET_SCREEN()
+    return {
+        "status": "success",
+        "message": "Screen captured"
+    }
 
 @app.post("/send-realtime", response_model=ResponseModel)
+@gemini_endpoint
 async def send_realtime():
     """Send realtime input to the Gemini Live session."""
-    try:
-        logger.info("Sending realtime input")
-        await GEMINI_SEND_REALTIME()
-        return {
-            "status": "success",
-            "message": "Realtime input sent",
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error in send_realtime: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Sending realtime input")
+    await GEMINI_SEND_REALTIME()
+    return {
+        "status": "success",
+        "message": "Realtime input sent"
+    }
 
 @app.post("/listen-audio", response_model=ResponseModel)
+@gemini_endpoint
 async def listen_audio():
     """Listen to audio input."""
-    try:
-        logger.info("Starting audio listening")
-        await GEMINI_LISTEN_AUDIO()
-        return {
-            "status": "success",
-            "message": "Listening to audio",
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error in listen_audio: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Starting audio listening")
+    await GEMINI_LISTEN_AUDIO()
+    return {
+        "status": "success",
+        "message": "Listening to audio"
+    }
 
 @app.post("/receive-audio", response_model=ResponseModel)
+@gemini_endpoint
 async def receive_audio():
     """Receive audio from the Gemini Live session."""
-    try:
-        logger.info("Receiving audio")
-        await GEMINI_RECEIVE_AUDIO()
-        return {
-            "status": "success",
-            "message": "Audio received",
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error in receive_audio: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Receiving audio")
+    await GEMINI_RECEIVE_AUDIO()
+    return {
+        "status": "success",
+        "message": "Audio received"
+    }
 
 @app.post("/play-audio", response_model=ResponseModel)
+@gemini_endpoint
 async def play_audio():
     """Play audio output."""
-    try:
-        logger.info("Starting audio playback")
-        await GEMINI_PLAY_AUDIO()
-        return {
-            "status": "success",
-            "message": "Audio playback started",
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error in play_audio: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Starting audio playback")
+    await GEMINI_PLAY_AUDIO()
+    return {
+        "status": "success",
+        "message": "Audio playback started"
+    }
 
 @app.post("/stop", response_model=ResponseModel)
 async def stop_gemini():
@@ -301,8 +297,7 @@ async def stop_gemini():
             raise HTTPException(status_code=500, detail="Failed to stop session")
         return {
             "status": "success",
-            "message": "Session ended successfully",
-            "timestamp": datetime.now().isoformat()
+            "message": "Session ended successfully"
         }
     except Exception as e:
         logger.error(f"Error in stop_gemini: {str(e)}")
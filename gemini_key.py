@@ -1,68 +1,68 @@
 """
 Wrapper interface for Gemini Live AudioLoop functionality.
 This module provides a simplified API to interact with the AudioLoop class.
+Each wrapper returns the AudioLoop coroutine itself for the caller to await.
 """
 
 import asyncio
+import threading
 from gemini_live_cam import AudioLoop
 
 # Global instance of AudioLoop
 _audio_loop = None
+# Guards creation and teardown of the global instance
+_audio_loop_lock = threading.Lock()
 
 def _ensure_audio_loop(mode="camera"):
     """Ensure AudioLoop instance exists and is initialized with the correct mode."""
     global _audio_loop
-    if _audio_loop is None:
-        _audio_loop = AudioLoop(video_mode=mode)
-    return _audio_loop
+    loop = _audio_loop
+    if loop is None:
+        with _audio_loop_lock:
+            if _audio_loop is None:
+                _audio_loop = AudioLoop(video_mode=mode)
+            loop = _audio_loop
+    return loop
 
-async def GEMINI_RUN(mode="camera"):
+def GEMINI_RUN(mode="camera"):
     """Run the main AudioLoop instance."""
-    loop = _ensure_audio_loop(mode)
-    await loop.run()
+    return _ensure_audio_loop(mode).run()
 
-async def GEMINI_SEND_TEXT():
+def GEMINI_SEND_TEXT():
     """Send text input to the AudioLoop instance."""
-    loop = _ensure_audio_loop()
-    await loop.send_text()
+    return _ensure_audio_loop().send_text()
 
-async def GEMINI_GET_FRAMES():
+def GEMINI_GET_FRAMES():
     """Get frames from the camera."""
-    loop = _ensure_audio_loop()
-    await loop.get_frames()
+    return _ensure_audio_loop().get_frames()
 
-async def GEMINI_GET_SCREEN():
+def GEMINI_GET_SCREEN():
     """Get screen capture frames."""
-    loop = _ensure_audio_loop(mode="screen")
-    await loop.get_screen()
+    return _ensure_audio_loop(mode="screen").get_screen()
 
-async def GEMINI_SEND_REALTIME():
+def GEMINI_SEND_REALTIME():
     """Send realtime input to the AudioLoop instance."""
-    loop = _ensure_audio_loop()
-    await loop.send_realtime()
+    return _ensure_audio_loop().send_realtime()
 
-async def GEMINI_LISTEN_AUDIO():
+def GEMINI_LISTEN_AUDIO():
     """Listen to audio input."""
-    loop = _ensure_audio_loop()
-    await loop.listen_audio()
+    return _ensure_audio_loop().listen_audio()
 
-async def GEMINI_RECEIVE_AUDIO():
+def GEMINI_RECEIVE_AUDIO():
     """Receive audio from the AudioLoop instance."""
-    loop = _ensure_audio_loop()
-    await loop.receive_audio()
+    return _ensure_audio_loop().receive_audio()
 
-async def GEMINI_PLAY_AUDIO():
+def GEMINI_PLAY_AUDIO():
     """Play audio output."""
-    loop = _ensure_audio_loop()
-    await loop.play_audio()
+    return _ensure_audio_loop().play_audio()
 
 async def GEMINI_STOP():
     """Stop the AudioLoop instance."""
     global _audio_loop
-    if _audio_loop is not None:
-        success = await _audio_loop.stop()
-        _audio_loop = None
-        return success
+    with _audio_loop_lock:
+        loop, _audio_loop = _audio_loop, None
+    if loop is not None:
+        return await loop.stop()
     return True
 
 # Helper function to run any of the async functions
@@ -7,21 +7,34 @@ Quickstart: https://github.com/google-gemini/cookbook/blob/main/quickstarts/Get_
 To install the dependencies for this script, run:
 
 ```
-pip install google-genai opencv-python pyaudio pillow mss python-dotenv
+pip install google-genai opencv-python pyaudio mss python-dotenv simplejpeg
 ```
+
+On hosts with an NVIDIA GPU, `pip install pynvjpeg` moves JPEG encoding onto the GPU.
 """
 
 import asyncio
-import base64
-import io
+import concurrent.futures
+import functools
+import threading
 import traceback
 import sys
 
 import cv2
 import pyaudio
-import PIL.Image
+import numpy as np
 import mss
 
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+try:
+    from nvjpeg import NvJpeg
+except ImportError:
+    NvJpeg = None
+
 import argparse
 
 from google import genai
@@ -46,9 +59,24 @@ CHANNELS = 1
 SEND_SAMPLE_RATE = 16000
 RECEIVE_SAMPLE_RATE = 24000
 CHUNK_SIZE = 1024
+# Received audio chunks buffered for playback; the oldest are dropped beyond this
+AUDIO_IN_QUEUE_SIZE = 64
+# Outgoing media is queued per kind so audio never waits behind video frames
+VIDEO_QUEUE_SIZE = 2
+AUDIO_QUEUE_SIZE = 16
+# Microphone audio is sent in batches of up to ~256ms (16-bit mono at 16kHz)
+# rather than one message per chunk
+AUDIO_BATCH_BYTES = 8192
+AUDIO_BATCH_SECONDS = 0.25
 
 MODEL = "models/gemini-2.0-flash-live-001"
 
+# Longest edge of images sent to the model
+MAX_IMAGE_SIZE = 1024
+JPEG_QUALITY = 85
+# Images sent to the model per second
+DEFAULT_VIDEO_FPS = 1.0
+
 DEFAULT_MODE = "camera"
 
 try:
@@ -77,19 +105,206 @@ CONFIG = types.LiveConnectConfig(
 
 pya = pyaudio.PyAudio()
 
+# Look up the default microphone once rather than on every session start.
+# Without one, leave it to PortAudio, which reports the error when the stream opens.
+try:
+    DEFAULT_INPUT_INDEX = int(pya.get_default_input_device_info()["index"])
+except OSError:
+    DEFAULT_INPUT_INDEX = None
+
+
+# GPU encoder, created on first use; stays None when no usable GPU is present.
+# Both the camera and screen paths encode from worker threads, so creating and
+# using it is serialised by _nvjpeg_lock.
+_nvjpeg = None
+_nvjpeg_lock = threading.Lock()
+# Set once nvJPEG has failed, so we stop trying and stay on the CPU
+_gpu_disabled = False
+
+
+def _gpu_encode(frame):
+    """Encode a BGR image on the GPU via nvJPEG, or return None if it can't be used"""
+    global _nvjpeg, _gpu_disabled
+    if NvJpeg is None or _gpu_disabled:
+        return None
+    with _nvjpeg_lock:
+        if _gpu_disabled:
+            return None
+        if _nvjpeg is None:
+            try:
+                _nvjpeg = NvJpeg()
+            except Exception as e:
+                # Installed but no usable CUDA device; don't try again
+                print(f"GPU JPEG encoding unavailable: {str(e)}")
+                _gpu_disabled = True
+                return None
+        try:
+            return _nvjpeg.encode(frame, JPEG_QUALITY)
+        except Exception as e:
+            print(f"GPU JPEG encoding failed, using the CPU from now on: {str(e)}")
+            _nvjpeg = None
+            _gpu_disabled = True
+            return None
+
+
+def _encode_jpeg(frame):
+    """Encode a BGR image as JPEG on the GPU via nvJPEG, else with simplejpeg or OpenCV"""
+    jpeg = _gpu_encode(frame)
+    if jpeg is not None:
+        return jpeg
+    if simplejpeg is not None:
+        return simplejpeg.encode_jpeg(frame, quality=JPEG_QUALITY, colorspace="BGR", fastdct=True)
+    # OpenCV's encoder is libjpeg(-turbo) too and also takes BGR directly
+    ok, buf = cv2.imencode(
+        ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+    )
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return buf.tobytes()
+
+
+async def _ticks(interval):
+    """Yield every `interval` seconds on a fixed schedule, however long each step takes"""
+    loop = asyncio.get_running_loop()
+    next_t = loop.time()
+    while True:
+        next_t += interval
+        delay = next_t - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            # Fell more than a whole interval behind; resync rather than burst
+            next_t = loop.time()
+        yield
+
+
+def _clear_queue(queue):
+    """Discard everything buffered in an asyncio.Queue in one call"""
+    # asyncio.Queue keeps its items in a deque, so clear that directly instead
+    # of looping over get_nowait(). Swapping in a new queue is not an option:
+    # a consumer already awaiting get() on the old one would never wake up.
+    # Nothing here uses join()/task_done(), so the unfinished count is left alone.
+    queue._queue.clear()
+
+
+def _shrink_to_fit(frame):
+    """Scale an image down to fit MAX_IMAGE_SIZE, keeping the aspect ratio"""
+    height, width = frame.shape[:2]
+    scale = MAX_IMAGE_SIZE / max(height, width)
+    if scale < 1.0:
+        # INTER_AREA is the right filter for downscaling
+        frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    return frame
+
+
+# The example Huffman tables from Annex K.3 of the JPEG standard, as one DHT
+# segment. UVC cameras commonly leave the DHT out of their MJPEG frames and
+# rely on these; not every decoder fills them in by itself.
+_STANDARD_DHT = bytes.fromhex(
+    "ffc401a2"
+    # DC luminance
+    "00" "00010501010101010100000000000000" "000102030405060708090a0b"
+    # AC luminance
+    "10" "0002010303020403050504040000017d"
+    "01020300041105122131410613516107227114328191a1082342b1c11552d1f0"
+    "2433627282090a161718191a25262728292a3435363738393a43444546474849"
+    "4a535455565758595a636465666768696a737475767778797a83848586878889"
+    "8a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5"
+    "c6c7c8c9cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8"
+    "f9fa"
+    # DC chrominance
+    "01" "00030101010101010101010000000000" "000102030405060708090a0b"
+    # AC chrominance
+    "11" "00020102040403040705040400010277"
+    "000102031104052131061241510761711322328108144291a1b1c109233352f0"
+    "156272d10a162434e125f11718191a262728292a35363738393a434445464748"
+    "494a535455565758595a636465666768696a737475767778797a828384858687"
+    "88898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3"
+    "c4c5c6c7c8c9cad2d3d4d5d6d7d8d9dae2e3e4e5e6e7e8e9eaf2f3f4f5f6f7f8"
+    "f9fa"
+)
+
+
+def _complete_mjpeg(jpeg):
+    """Check an MJPEG frame from the camera and make it a standalone JPEG
+
+    Returns (jpeg, width, height), or None if the frame doesn't parse, e.g. it
+    was cut short. The standard Huffman tables are added if the frame has none.
+    """
+    # UVC buffers may carry padding after the end-of-image marker
+    end = jpeg.rfind(b"\xff\xd9")
+    if not jpeg.startswith(b"\xff\xd8") or end < 0:
+        return None
+    jpeg = jpeg[:end + 2]
+
+    # Walk the header segments up to the start of the scan
+    pos = 2
+    has_dht = False
+    width = height = 0
+    while True:
+        if pos + 4 > len(jpeg) or jpeg[pos] != 0xFF:
+            return None
+        marker = jpeg[pos + 1]
+        if marker == 0xFF:
+            # Fill byte ahead of a marker
+            pos += 1
+            continue
+        if marker == 0xDA:
+            break
+        length = int.from_bytes(jpeg[pos + 2:pos + 4], "big")
+        if length < 2:
+            return None
+        if marker == 0xC4:
+            has_dht = True
+        elif marker in (0xC0, 0xC1, 0xC2) and length >= 8:
+            height = int.from_bytes(jpeg[pos + 5:pos + 7], "big")
+            width = int.from_bytes(jpeg[pos + 7:pos + 9], "big")
+        pos += 2 + length
+
+    if not width or not height:
+        return None
+    if not has_dht:
+        jpeg = jpeg[:pos] + _STANDARD_DHT + jpeg[pos:]
+    return jpeg, width, height
+
 
 class AudioLoop:
-    def __init__(self, video_mode=DEFAULT_MODE):
+    def __init__(self, video_mode=DEFAULT_MODE, read_stdin=True, on_text=None, video_fps=DEFAULT_VIDEO_FPS,
+                 show_preview=True, frame_source=None):
         self.video_mode = video_mode
-
-        self.audio_in_queue = asyncio.Queue()
-        self.out_queue = asyncio.Queue(maxsize=5)
+        self.frame_interval = 1.0 / video_fps
+        # When False, no OpenCV window is opened (e.g. when embedded in a server)
+        self.show_preview = show_preview
+        # Callable returning the newest BGR frame or None. When set, camera mode
+        # uploads from it instead of opening the camera itself.
+        self.frame_source = frame_source
+        # When False, text is sent via send_text_value() and run() lasts until stopped
+        self.read_stdin = read_stdin
+        # Called with each text chunk from the model instead of printing it
+        self.on_text = on_text
+
+        self.audio_in_queue = asyncio.Queue(maxsize=AUDIO_IN_QUEUE_SIZE)
+        self.video_queue = asyncio.Queue(maxsize=VIDEO_QUEUE_SIZE)
+        self.audio_queue = asyncio.Queue(maxsize=AUDIO_QUEUE_SIZE)
 
         self.session = None  # Will be initialized in the run method
 
+        # Newest camera frame, written by the preview loop and read by the upload loop.
+        # Either a BGR array, or JPEG bytes when the camera delivers MJPEG untouched.
+        self._latest_frame = None
+
+        # Screen grabber and the one thread allowed to use it, created on first use
+        self._sct = None
+        self._screen_executor = None
+
+        # Dedicated threads for audio I/O, created on first use
+        self._audio_exec = None
+
         self.send_text_task = None
         self.receive_audio_task = None
         self.play_audio_task = None
+        # Tasks created by run(), cancelled by stop()
+        self._tasks = []
 
     async def send_text(self):
         while True:
@@ -99,23 +314,49 @@ class AudioLoop:
             )
             if text.lower() == "q":
                 break
-            if self.session is not None:
-                await self.session.send_client_content(
-                    turns=types.Content(
-                        role="user",
-                        parts=[types.Part(text=text or ".")]
-                    )
+            await self.send_text_value(text)
+
+    async def send_text_value(self, text):
+        """Send a single text turn to the session"""
+        if self.session is not None:
+            await self.session.send_client_content(
+                turns=types.Content(
+                    role="user",
+                    parts=[types.Part(text=text or ".")]
                 )
-            else:
-                print("Session is not initialized. Unable to send text.")
+            )
+        else:
+            print("Session is not initialized. Unable to send text.")
 
-    def _get_frame(self, cap):
-        # Read the frame
-        ret, frame = cap.read()
+    def _grab_and_show(self, cap):
+        """Read the next camera frame into _latest_frame and show it in the preview window"""
+        # The preview consumes every frame the camera delivers, so the one-frame
+        # driver buffer never holds anything stale
+        if not cap.grab():
+            return None
+        ret, frame = cap.retrieve()
         # Check if the frame was read successfully
         if not ret:
             return None
 
+        if frame.ndim == 2 and frame.shape[0] == 1 and frame.dtype == np.uint8:
+            # The backend handed over the camera's own MJPEG buffer as a single row
+            # of bytes. Keep those bytes for upload and decode a copy only for the preview.
+            jpeg = frame.tobytes()
+            if self.show_preview:
+                frame = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+                if frame is None:
+                    # Cameras emit the odd corrupt frame, especially right after opening
+                    return "OK"
+            latest = jpeg
+        else:
+            latest = frame
+        # Swapping the reference is atomic, so the upload loop can read it without a lock
+        self._latest_frame = latest
+
+        if not self.show_preview:
+            return "OK"
+
         # Display the frame in an OpenCV window
         cv2.imshow('Gemini Live Camera', frame)
 
@@ -123,23 +364,51 @@ class AudioLoop:
         key = cv2.waitKey(1)
         if key == 27:  # ESC key
             return "ESC_PRESSED"
+        return "OK"
 
-        # Fix: Convert BGR to RGB color space
-        # OpenCV captures in BGR but PIL expects RGB format
-        # This prevents the blue tint in the video feed
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = PIL.Image.fromarray(frame_rgb)  # Now using RGB frame
-        img.thumbnail((1024, 1024))
-
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
+    def _encode_frame(self, frame):
+        frame = _shrink_to_fit(frame)
 
+        # Encoded straight from OpenCV's BGR layout, so no colour conversion is needed
         mime_type = "image/jpeg"
-        image_bytes = image_io.read()
-        return {"mime_type": mime_type, "data": base64.b64encode(image_bytes).decode()}
+        image_bytes = _encode_jpeg(frame)
+        return {"mime_type": mime_type, "data": image_bytes}
+
+    def _camera_jpeg_msg(self, jpeg):
+        """Message for an MJPEG frame from the camera, or None to skip the frame"""
+        parsed = _complete_mjpeg(jpeg)
+        if parsed is None:
+            # Cameras emit the odd corrupt frame, especially right after opening
+            return None
+        jpeg, width, height = parsed
+        if max(width, height) <= MAX_IMAGE_SIZE:
+            # Already small enough; forward it without re-encoding
+            return {"mime_type": "image/jpeg", "data": jpeg}
+        frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return None
+        return self._encode_frame(frame)
+
+    async def upload_frames(self):
+        """Encode and queue the latest camera frame once every frame_interval"""
+        async for _ in _ticks(self.frame_interval):
+            frame = self.frame_source() if self.frame_source else self._latest_frame
+            # If the sender is backed up, skip this frame before paying to encode it
+            if frame is None or self.video_queue.full():
+                continue
+            if isinstance(frame, bytes):
+                msg = await asyncio.to_thread(self._camera_jpeg_msg, frame)
+                if msg is None:
+                    continue
+            else:
+                msg = await asyncio.to_thread(self._encode_frame, frame)
+            await self.video_queue.put(msg)
 
     async def get_frames(self):
+        if self.frame_source:
+            # Someone else owns the camera; just upload what it captures
+            await self.upload_frames()
+            return
         try:
             cap = await asyncio.to_thread(
                 cv2.VideoCapture, 0
@@ -150,86 +419,188 @@ class AudioLoop:
                 print("Error: Could not open camera.")
                 return
 
-            while True:
-                frame = await asyncio.to_thread(self._get_frame, cap)
-
-                # Check if frame is None (camera disconnected) or ESC was pressed
-                if frame is None:
-                    print("Camera disconnected.")
-                    break
-                elif frame == "ESC_PRESSED":
-                    print("ESC key pressed. Stopping camera feed.")
-                    break
-
-                await asyncio.sleep(1.0)
-                await self.out_queue.put(frame)
+            # Ask for MJPG at 720p: UVC cameras compress MJPG in hardware, whereas
+            # the default uncompressed format costs bus bandwidth and conversion
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+            # Keep at most one frame queued in the driver so it is never far behind
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            # Where the backend supports it (V4L2), hand back the compressed MJPEG
+            # buffers rather than decoding them; other backends keep returning BGR.
+            # Only when MJPG was actually negotiated: raw YUYV/GREY/NV12 buffers
+            # are no use to us undecoded.
+            if int(cap.get(cv2.CAP_PROP_FOURCC)) == cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'):
+                cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+
+            # The preview runs at camera rate here; uploads run once every frame_interval
+            # Under a TaskGroup so an error in the upload loop ends the preview too
+            # and surfaces below instead of dying with an unawaited task
+            async with asyncio.TaskGroup() as tg:
+                upload_task = tg.create_task(self.upload_frames(), name="upload_frames")
+                while True:
+                    status = await asyncio.to_thread(self._grab_and_show, cap)
+
+                    # Check if status is None (camera disconnected) or ESC was pressed
+                    if status is None:
+                        print("Camera disconnected.")
+                        break
+                    elif status == "ESC_PRESSED":
+                        print("ESC key pressed. Stopping camera feed.")
+                        break
+                upload_task.cancel()
 
         except Exception as e:
             print(f"Error in get_frames: {str(e)}")
         finally:
             # Release the VideoCapture object and destroy all OpenCV windows
+            self._latest_frame = None
             if 'cap' in locals() and cap is not None:
                 cap.release()
-            cv2.destroyAllWindows()
+            if self.show_preview:
+                cv2.destroyAllWindows()
             print("Camera resources released.")
 
     def _get_screen(self):
-        sct = mss.mss()
-        monitor = sct.monitors[0]
+        # Opening an MSS instance connects to the display server, so do it once.
+        # This only ever runs on _screen_executor's single thread, which MSS requires.
+        if self._sct is None:
+            self._sct = mss.mss()
+        monitor = self._sct.monitors[0]
 
-        i = sct.grab(monitor)
+        i = self._sct.grab(monitor)
 
-        mime_type = "image/jpeg"
-        image_bytes = i.rgb  # Directly use the RGB data from the screen capture
-        img = PIL.Image.open(io.BytesIO(image_bytes))
+        # MSS captures raw BGRA pixels; view them in place without a copy
+        frame = np.frombuffer(i.raw, dtype=np.uint8).reshape(i.height, i.width, 4)
+        # The model gains nothing from more than MAX_IMAGE_SIZE, so shrink first
+        frame = _shrink_to_fit(frame)
+        # Vectorized BGRA -> BGR, which also yields the contiguous buffer the encoder wants
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
 
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
+        mime_type = "image/jpeg"
+        image_bytes = _encode_jpeg(frame)
+        return {"mime_type": mime_type, "data": image_bytes}
 
-        image_bytes = image_io.read()
-        return {"mime_type": mime_type, "data": base64.b64encode(image_bytes).decode()}
+    def _close_screen(self):
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
 
     async def get_screen(self):
+        loop = asyncio.get_running_loop()
+        if self._screen_executor is None:
+            self._screen_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="screen"
+            )
+        # Held locally: once stop() has cleared the attribute, passing None would
+        # quietly grab on the default executor and open an MSS instance nobody closes
+        executor = self._screen_executor
 
-        while True:
-            frame = await asyncio.to_thread(self._get_screen)
+        async for _ in _ticks(self.frame_interval):
+            # If the sender is backed up, skip this capture before paying to grab and encode it
+            if self.video_queue.full():
+                continue
+            try:
+                frame = await loop.run_in_executor(executor, self._get_screen)
+            except RuntimeError:
+                # The executor was shut down by stop()
+                break
             if frame is None:
                 break
 
-            await asyncio.sleep(1.0)
-
-            await self.out_queue.put(frame)
+            await self.video_queue.put(frame)
+
+    async def _next_realtime_msgs(self):
+        """Wait for outgoing media, returning audio ahead of video"""
+        msgs = []
+        if not self.audio_queue.empty():
+            msgs.append(self.audio_queue.get_nowait())
+        if not self.video_queue.empty():
+            msgs.append(self.video_queue.get_nowait())
+        if msgs:
+            return msgs
+
+        # Nothing is waiting; take whichever arrives first. A get() that is
+        # cancelled before it resumes leaves its item in the queue.
+        gets = [
+            asyncio.ensure_future(self.audio_queue.get()),
+            asyncio.ensure_future(self.video_queue.get()),
+        ]
+        try:
+            await asyncio.wait(gets, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for get in gets:
+                if not get.done():
+                    get.cancel()
+        return [get.result() for get in gets if get.done() and not get.cancelled()]
+
+    async def _batch_audio(self, msg):
+        """Coalesce the next few microphone chunks into msg, up to AUDIO_BATCH_BYTES"""
+        data = bytearray(msg["data"])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + AUDIO_BATCH_SECONDS
+        while len(data) < AUDIO_BATCH_BYTES:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                more = await asyncio.wait_for(self.audio_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            data += more["data"]
+        return {"data": bytes(data), "mime_type": msg["mime_type"]}
 
     async def send_realtime(self):
         while True:
-            msg = await self.out_queue.get()
-            if self.session is not None:
-                # For audio: send as types.Blob
-                await self.session.send_realtime_input(
-                    media=types.Blob(data=msg["data"], mime_type=msg["mime_type"])
-                )
-            else:
-                print("Session is not initialized. Unable to send message.")
+            for msg in await self._next_realtime_msgs():
+                # Video frames already arrive only once every frame_interval; only audio is worth batching
+                if msg["mime_type"] == "audio/pcm":
+                    msg = await self._batch_audio(msg)
+                if self.session is not None:
+                    # Audio and JPEG frames are both sent as raw bytes in a types.Blob
+                    await self.session.send_realtime_input(
+                        media=types.Blob(data=msg["data"], mime_type=msg["mime_type"])
+                    )
+                else:
+                    print("Session is not initialized. Unable to send message.")
+
+    def _audio_executor(self):
+        """Threads reserved for blocking PortAudio reads and writes"""
+        # One worker each for the microphone and the speaker, kept warm for the
+        # whole session rather than borrowed from the shared default executor
+        if self._audio_exec is None:
+            self._audio_exec = concurrent.futures.ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="audio"
+            )
+        return self._audio_exec
+
+    def _read_mic(self, **kwargs):
+        """Read at least one chunk from the microphone, plus anything already captured"""
+        # When the sender falls behind, this collects the backlog into one bytes
+        # object and one queue entry instead of one of each per chunk
+        frames = max(CHUNK_SIZE, self.audio_stream.get_read_available())
+        return self.audio_stream.read(frames, **kwargs)
 
     async def listen_audio(self):
-        mic_info = pya.get_default_input_device_info()
         self.audio_stream = await asyncio.to_thread(
             pya.open,
             format=FORMAT,
             channels=CHANNELS,
             rate=SEND_SAMPLE_RATE,
             input=True,
-            input_device_index=int(mic_info["index"]),
+            input_device_index=DEFAULT_INPUT_INDEX,
             frames_per_buffer=CHUNK_SIZE,
         )
         if __debug__:
             kwargs = {"exception_on_overflow": False}
         else:
             kwargs = {}
+        loop = asyncio.get_running_loop()
+        executor = self._audio_executor()
+        read = functools.partial(self._read_mic, **kwargs)
         while True:
-            data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **kwargs)
-            await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
+            data = await loop.run_in_executor(executor, read)
+            await self.audio_queue.put({"data": data, "mime_type": "audio/pcm"})
 
     async def receive_audio(self):
         "Background task to reads from the websocket and write pcm chunks to the output queue"
@@ -242,17 +613,24 @@ class AudioLoop:
             turn = self.session.receive()
             async for response in turn:
                 if data := response.data:
-                    self.audio_in_queue.put_nowait(data)
+                    try:
+                        self.audio_in_queue.put_nowait(data)
+                    except asyncio.QueueFull:
+                        # Playback has fallen behind; drop the oldest chunk to bound memory and latency
+                        self.audio_in_queue.get_nowait()
+                        self.audio_in_queue.put_nowait(data)
                     continue
                 if text := response.text:
-                    print(text, end="")
+                    if self.on_text is not None:
+                        self.on_text(text)
+                    else:
+                        print(text, end="")
 
             # If you interrupt the model, it sends a turn_complete.
             # For interruptions to work, we need to stop playback.
             # So empty out the audio queue because it may have loaded
             # much more audio than has played yet.
-            while not self.audio_in_queue.empty():
-                self.audio_in_queue.get_nowait()
+            _clear_queue(self.audio_in_queue)
 
     async def play_audio(self):
         stream = await asyncio.to_thread(
@@ -262,9 +640,11 @@ class AudioLoop:
             rate=RECEIVE_SAMPLE_RATE,
             output=True,
         )
+        loop = asyncio.get_running_loop()
+        executor = self._audio_executor()
         while True:
             bytestream = await self.audio_in_queue.get()
-            await asyncio.to_thread(stream.write, bytestream)
+            await loop.run_in_executor(executor, stream.write, bytestream)
 
     async def run(self):
         try:
@@ -274,27 +654,35 @@ class AudioLoop:
             ):
                 self.session = session
 
-                self.audio_in_queue = asyncio.Queue()
-                self.out_queue = asyncio.Queue(maxsize=5)
-
-                send_text_task = tg.create_task(self.send_text())
-                tg.create_task(self.send_realtime())
-                tg.create_task(self.listen_audio())
+                self.audio_in_queue = asyncio.Queue(maxsize=AUDIO_IN_QUEUE_SIZE)
+                self.video_queue = asyncio.Queue(maxsize=VIDEO_QUEUE_SIZE)
+                self.audio_queue = asyncio.Queue(maxsize=AUDIO_QUEUE_SIZE)
+
+                # Tracked so stop() can cancel exactly these tasks
+                self._tasks = []
+                if self.read_stdin:
+                    send_text_task = tg.create_task(self.send_text(), name="send_text")
+                    self._tasks.append(send_text_task)
+                self._tasks.append(tg.create_task(self.send_realtime(), name="send_realtime"))
+                self._tasks.append(tg.create_task(self.listen_audio(), name="listen_audio"))
                 if self.video_mode == "camera":
-                    tg.create_task(self.get_frames())
+                    self._tasks.append(tg.create_task(self.get_frames(), name="get_frames"))
                 elif self.video_mode == "screen":
-                    tg.create_task(self.get_screen())
+                    self._tasks.append(tg.create_task(self.get_screen(), name="get_screen"))
 
-                tg.create_task(self.receive_audio())
-                tg.create_task(self.play_audio())
+                self._tasks.append(tg.create_task(self.receive_audio(), name="receive_audio"))
+                self._tasks.append(tg.create_task(self.play_audio(), name="play_audio"))
 
-                await send_text_task
-                raise asyncio.CancelledError("User requested exit")
+                if self.read_stdin:
+                    await send_text_task
+                    raise asyncio.CancelledError("User requested exit")
 
         except asyncio.CancelledError:
             pass
         except ExceptionGroup as EG:
-            self.audio_stream.close()
+            # stop() may already have closed the stream, or it was never opened
+            if getattr(self, 'audio_stream', None) is not None:
+                self.audio_stream.close()
             traceback.print_exception(EG)
 
     async def stop(self):
@@ -302,12 +690,35 @@ class AudioLoop:
         try:
             print("Stopping camera and microphone...")
 
-            # Close any OpenCV windows
+            # Cancel the tasks started by run() first, so none of them can touch
+            # the stream, executors or session while they are torn down below
+            print("Cancelling tasks...")
             try:
-                cv2.destroyAllWindows()
-                print("Closed OpenCV windows")
+                # Never cancel ourselves, e.g. if stop() is awaited from one of our tasks
+                current_task = asyncio.current_task()
+                tasks_to_cancel = [task for task in self._tasks if task is not current_task and not task.done()]
+                self._tasks = []
+
+                # Cancel the identified tasks
+                for task in tasks_to_cancel:
+                    print(f"Cancelling task: {task.get_name()}")
+                    task.cancel()
+
+                # Wait for all tasks to be cancelled
+                if tasks_to_cancel:
+                    await asyncio.gather(*tasks_to_cancel, return_exceptions=True)
+
+                print(f"Successfully cancelled {len(tasks_to_cancel)} tasks")
             except Exception as e:
-                print(f"Error closing OpenCV windows: {str(e)}")
+                print(f"Error cancelling tasks: {str(e)}")
+
+            # Close any OpenCV windows
+            if self.show_preview:
+                try:
+                    cv2.destroyAllWindows()
+                    print("Closed OpenCV windows")
+                except Exception as e:
+                    print(f"Error closing OpenCV windows: {str(e)}")
 
             # Stop audio stream if it exists
             if hasattr(self, 'audio_stream') and self.audio_stream:
@@ -320,13 +731,28 @@ class AudioLoop:
                 finally:
                     self.audio_stream = None
 
+            # Close the screen grabber on the thread that owns it
+            if self._screen_executor is not None:
+                print("Closing screen capture...")
+                try:
+                    await asyncio.get_running_loop().run_in_executor(self._screen_executor, self._close_screen)
+                except Exception as e:
+                    print(f"Error closing screen capture: {str(e)}")
+                finally:
+                    self._screen_executor.shutdown(wait=False)
+                    self._screen_executor = None
+
+            # Release the audio threads; any read or write in flight finishes on its own
+            if self._audio_exec is not None:
+                self._audio_exec.shutdown(wait=False)
+                self._audio_exec = None
+
             # Clear all queues
             print("Clearing queues...")
             try:
-                while not self.audio_in_queue.empty():
-                    self.audio_in_queue.get_nowait()
-                while not self.out_queue.empty():
-                    self.out_queue.get_nowait()
+                _clear_queue(self.audio_in_queue)
+                _clear_queue(self.video_queue)
+                _clear_queue(self.audio_queue)
             except Exception as e:
                 print(f"Error clearing queues: {str(e)}")
 
@@ -347,35 +773,6 @@ class AudioLoop:
                 finally:
                     self.session = None
 
-            # Cancel all running tasks
-            print("Cancelling tasks...")
-            try:
-                # Get the current task to avoid cancelling ourselves
-                current_task = asyncio.current_task()
-
-                # Only cancel tasks that are part of our application
-                # This is safer than cancelling all tasks in the event loop
-                tasks_to_cancel = []
-                for task in asyncio.all_tasks():
-                    if task != current_task:
-                        # Check if the task is related to our application
-                        task_name = task.get_name()
-                        if "gemini" in task_name.lower() or "audio" in task_name.lower() or "send" in task_name.lower() or "receive" in task_name.lower():
-                            tasks_to_cancel.append(task)
-
-                # Cancel the identified tasks
-                for task in tasks_to_cancel:
-                    print(f"Cancelling task: {task.get_name()}")
-                    task.cancel()
-
-                # Wait for all tasks to be cancelled
-                if tasks_to_cancel:
-                    await asyncio.gather(*tasks_to_cancel, return_exceptions=True)
-
-                print(f"Successfully cancelled {len(tasks_to_cancel)} tasks")
-            except Exception as e:
-                print(f"Error cancelling tasks: {str(e)}")
-
             print("Camera and microphone stopped successfully")
             return True
         except Exception as e:
@@ -392,6 +789,14 @@ if __name__ == "__main__":
         help="pixels to stream from",
         choices=["camera", "screen", "none"],
     )
+    parser.add_argument(
+        "--video-fps",
+        type=float,
+        default=DEFAULT_VIDEO_FPS,
+        help="images per second to send to the model",
+    )
     args = parser.parse_args()
-    main = AudioLoop(video_mode=args.mode)
+    if args.video_fps <= 0:
+        parser.error("--video-fps must be greater than 0")
+    main = AudioLoop(video_mode=args.mode, video_fps=args.video_fps)
     asyncio.run(main.run())